@@ -1,5 +1,8 @@
 # app.py
-from flask import Flask, render_template, request, redirect, url_for, flash, session
+from flask import (
+    Flask, render_template, request, redirect, url_for, flash, session,
+    jsonify, send_from_directory,
+)
 from datetime import datetime, date
 import os
 import secrets
@@ -16,6 +19,10 @@ from utils.functions import (
     # i18n
     get_supported_languages, get_default_locale, get_default_timezone, resolve_locale,
     get_currency_symbol, get_currency_choices,
+    # Offline-Sync
+    ensure_sync_schema, insert_expenses_bulk, MAX_BULK_EXPENSES, MAX_DESCRIPTION_LENGTH,
+    # Wartung
+    ensure_maintenance_schema, reclaim_free_pages,
 )
 
 app = Flask(__name__, template_folder="templates", static_folder="static")
@@ -33,6 +40,16 @@ try:
 except Exception as e:
     print(f"ensure_settings() übersprungen: {e}")
 
+try:
+    ensure_sync_schema()
+except Exception as e:
+    print(f"ensure_sync_schema() übersprungen: {e}")
+
+try:
+    ensure_maintenance_schema()
+except Exception as e:
+    print(f"ensure_maintenance_schema() übersprungen: {e}")
+
 # ---- Babel Setup ----
 app.config["BABEL_DEFAULT_LOCALE"] = get_default_locale()
 app.config["BABEL_DEFAULT_TIMEZONE"] = get_default_timezone()
@@ -60,6 +77,8 @@ def validate_csrf() -> bool:
 def protect_against_csrf():
     if request.method in ("POST", "PUT", "PATCH", "DELETE"):
         if not validate_csrf():
+            if request.is_json:
+                return jsonify(error="csrf"), 403
             flash(_("Ungültige Anfrage (CSRF). Bitte Seite neu laden."), "error")
             return redirect(url_for("index"))
 
@@ -208,7 +227,7 @@ def index():
     # POST: neue Ausgabe
     if request.method == "POST":
         raw_amount = (request.form.get("betrag", "") or "").replace(",", ".").strip()
-        beschreibung = request.form.get("beschreibung", "").strip()
+        beschreibung = request.form.get("beschreibung", "").strip()[:MAX_DESCRIPTION_LENGTH]
         try:
             betrag = -abs(float(raw_amount))
         except ValueError:
@@ -259,8 +278,31 @@ def index():
         show_transfer=not activated_this_week(),
         currency=get_currency_symbol(),                 # z.B. "€"
         currency_choices=get_currency_choices(),        # Liste für Dropdown
+        max_bulk_expenses=MAX_BULK_EXPENSES,            # Batch-Größe für Offline-Sync
+        max_description_length=MAX_DESCRIPTION_LENGTH,
     )
 
+# ---- Offline-Sync (PWA) ----
+@app.route("/sw.js")
+def service_worker():
+    # Service Worker muss unter / liegen, damit er die ganze App abdeckt
+    response = send_from_directory(app.static_folder, "sw.js", mimetype="application/javascript")
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+@app.route("/api/expenses/bulk", methods=["POST"])
+def bulk_expenses():
+    # Offline gesammelte Ausgaben in einem Rutsch speichern (idempotent über client_id)
+    payload = request.get_json(silent=True)
+    items = payload.get("expenses") if isinstance(payload, dict) else None
+    if not isinstance(items, list):
+        return jsonify(error="invalid_payload"), 400
+    if len(items) > MAX_BULK_EXPENSES:
+        return jsonify(error="too_many", max=MAX_BULK_EXPENSES), 413
+
+    accepted, rejected = insert_expenses_bulk(items)
+    return jsonify(accepted=accepted, rejected=rejected)
+
 # ---- Wartung ----
 @app.route("/delete/<int:id>", methods=["POST"])
 def delete(id):
@@ -281,6 +323,7 @@ def clear_expenses():
     cur.execute("DELETE FROM ausgaben")
     conn.commit()
     conn.close()
+    reclaim_free_pages()
     flash(_(f"{deleted_count} Ausgaben gelöscht."), "success")
     return redirect(url_for("index"))
 
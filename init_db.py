@@ -6,16 +6,29 @@ DB_PATH = os.environ.get("BUDGET_DB_PATH", "budget.db")
 conn = sqlite3.connect(DB_PATH)
 c = conn.cursor()
 
+# freie Seiten später per `maintenance.py optimize` zurückgeben (wirkt nur bei neuer DB)
+c.execute("PRAGMA auto_vacuum = INCREMENTAL")
+
 # Tabelle für Ausgaben
 c.execute("""
 CREATE TABLE IF NOT EXISTS ausgaben (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     datum TEXT NOT NULL,
     betrag REAL NOT NULL,
-    beschreibung TEXT
+    beschreibung TEXT,
+    client_id TEXT
 )
 """)
 
+# client_id für Offline-Sync nachrüsten (ältere DBs) + Duplikatschutz
+c.execute("PRAGMA table_info(ausgaben)")
+if "client_id" not in {row[1] for row in c.fetchall()}:
+    c.execute("ALTER TABLE ausgaben ADD COLUMN client_id TEXT")
+c.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_ausgaben_client_id ON ausgaben (client_id)")
+
+# Index für Wochenabfragen
+c.execute("CREATE INDEX IF NOT EXISTS idx_ausgaben_datum ON ausgaben (date(datum))")
+
 # Tabelle für Einstellungen (z. B. Monatsbudget, Start- und Endtag)
 c.execute("""
 CREATE TABLE IF NOT EXISTS einstellungen (
@@ -34,6 +47,20 @@ CREATE TABLE IF NOT EXISTS transfer_log (
 )
 """)
 
+# Summen archivierter Zyklen (maintenance.py retention)
+c.execute("""
+CREATE TABLE IF NOT EXISTS zyklus_summen (
+    zyklus_start TEXT PRIMARY KEY,
+    zyklus_ende TEXT NOT NULL,
+    summe REAL NOT NULL DEFAULT 0,
+    anzahl INTEGER NOT NULL DEFAULT 0,
+    archiviert_am TEXT DEFAULT CURRENT_TIMESTAMP
+)
+""")
+
+# client_ids archivierter Ausgaben (Duplikatschutz beim Offline-Sync)
+c.execute("CREATE TABLE IF NOT EXISTS archiv_client_ids (client_id TEXT PRIMARY KEY)")
+
 # Grundeinstellungen initial eintragen, falls nicht vorhanden
 c.execute("INSERT OR IGNORE INTO einstellungen (key, value) VALUES (?, ?)", ("start_day", 27))
 c.execute("INSERT OR IGNORE INTO einstellungen (key, value) VALUES (?, ?)", ("end_day", 26))
@@ -0,0 +1,268 @@
+# maintenance.py
+"""
+Wartung für budget.db (BUDGET_DB_PATH):
+
+  python3 maintenance.py backup   [--dest backups] [--keep 7]
+  python3 maintenance.py optimize [--pages 0] [--analyze]
+  python3 maintenance.py retention [--keep-cycles 12] [--archive-dir archive]
+
+Für regelmäßige Ausführung z. B. per cron (siehe README).
+"""
+import argparse
+import gzip
+import json
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime, date, timedelta
+
+from utils.functions import (
+    DB_PATH, get_connection, ensure_maintenance_schema, ensure_sync_schema,
+    get_start_day, get_end_day, get_cycle_for_date, current_week_start,
+)
+
+# Seiten pro Backup-Schritt; nach jedem Schritt kurze Pause (progress-Callback),
+# damit die App zwischendurch schreiben kann
+BACKUP_STEP_PAGES = 256
+BACKUP_STEP_PAUSE = 0.05
+
+# -----------------------------
+# Backup
+# -----------------------------
+def backup(dest_dir: str, keep: int) -> str:
+    """
+    Online-Backup über die sqlite3-Backup-API.
+    Kopiert schrittweise mit Pause zwischen den Schritten, damit die App
+    währenddessen weiter schreiben kann. Geschrieben wird in eine `.part`-Datei,
+    die erst nach erfolgreichem quick_check umbenannt wird.
+    """
+    os.makedirs(dest_dir, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    base = os.path.splitext(os.path.basename(DB_PATH))[0]
+    target = os.path.join(dest_dir, f"{base}-{stamp}.db")
+    part = target + ".part"
+
+    try:
+        src = get_connection()
+        dst = sqlite3.connect(part)
+        try:
+            src.backup(
+                dst,
+                pages=BACKUP_STEP_PAGES,
+                progress=lambda status, remaining, total: time.sleep(BACKUP_STEP_PAUSE),
+            )
+            check = dst.execute("PRAGMA quick_check").fetchone()[0]
+            if check != "ok":
+                raise RuntimeError(f"Backup fehlerhaft (quick_check): {check}")
+        finally:
+            dst.close()
+            src.close()
+        os.replace(part, target)
+    finally:
+        if os.path.exists(part):
+            os.remove(part)
+
+    if keep > 0:
+        old = sorted(
+            f for f in os.listdir(dest_dir)
+            if f.startswith(f"{base}-") and f.endswith(".db")
+        )
+        for name in old[:-keep]:
+            os.remove(os.path.join(dest_dir, name))
+
+    return target
+
+# -----------------------------
+# Vacuum / Statistik
+# -----------------------------
+def enable_incremental_vacuum(conn) -> bool:
+    """
+    Stellt auto_vacuum auf INCREMENTAL um (einmaliges VACUUM nötig).
+    Rückgabe: True, wenn umgestellt wurde.
+    """
+    mode = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+    if mode == 2:  # INCREMENTAL
+        return False
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    conn.execute("VACUUM")
+    return True
+
+def compact(pages: int = 0, analyze: bool = False) -> dict:
+    """
+    Gibt freie Seiten frei (incremental_vacuum) und aktualisiert die Planer-Statistik
+    per PRAGMA optimize (analysiert nur bei Bedarf; analyze=True erzwingt ANALYZE).
+    Stellt auto_vacuum nicht um (ohne INCREMENTAL wird nichts freigegeben).
+    pages=0 -> alle freien Seiten.
+    """
+    conn = get_connection()
+    conn.isolation_level = None  # PRAGMA außerhalb einer Transaktion
+    try:
+        free_before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        # executescript statt execute: execute() gibt nur eine Seite pro Aufruf frei
+        if pages > 0:
+            conn.executescript(f"PRAGMA incremental_vacuum({int(pages)});")
+        else:
+            conn.executescript("PRAGMA incremental_vacuum;")
+        free_after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if analyze:
+            conn.execute("ANALYZE")
+        conn.execute("PRAGMA optimize")
+    finally:
+        conn.close()
+    return {
+        "freed_pages": free_before - free_after,
+        "free_pages": free_after,
+    }
+
+def optimize(pages: int = 0, analyze: bool = False) -> dict:
+    """
+    Wie compact(), stellt vorher aber einmalig auf auto_vacuum=INCREMENTAL um
+    (vollständiges, blockierendes VACUUM).
+    """
+    ensure_maintenance_schema()
+    conn = get_connection()
+    conn.isolation_level = None  # VACUUM außerhalb einer Transaktion
+    try:
+        converted = enable_incremental_vacuum(conn)
+    finally:
+        conn.close()
+    result = compact(pages, analyze)
+    result["converted"] = converted
+    return result
+
+# -----------------------------
+# Retention / Archiv
+# -----------------------------
+def retention_cutoff(keep_cycles: int, today: date | None = None) -> date:
+    """
+    Erster Tag, der behalten wird: Beginn des ältesten der letzten `keep_cycles` Zyklen.
+    Die Vorwoche bleibt immer erhalten (wird für den Wochenübertrag gebraucht).
+    """
+    if today is None:
+        today = date.today()
+    start_day = get_start_day()
+    end_day = get_end_day()
+
+    cycle_start, _ = get_cycle_for_date(today, start_day, end_day)
+    for _ in range(max(1, keep_cycles) - 1):
+        cycle_start, _ = get_cycle_for_date(cycle_start - timedelta(days=1), start_day, end_day)
+
+    last_week_start = current_week_start(today) - timedelta(days=7)
+    return min(cycle_start, last_week_start)
+
+def retention(keep_cycles: int, archive_dir: str) -> dict:
+    """
+    Rollt Ausgaben vor dem Stichtag in `zyklus_summen` (Summe/Anzahl je Zyklus)
+    und verschiebt die Rohdaten in eine gzip-komprimierte JSON-Lines-Datei.
+    Lesen, Archivieren und Löschen laufen in einer Schreibtransaktion; schlägt
+    der Commit fehl, wird die Archivdatei wieder entfernt.
+    """
+    ensure_sync_schema()
+    ensure_maintenance_schema()
+    cutoff = retention_cutoff(keep_cycles)
+    start_day = get_start_day()
+    end_day = get_end_day()
+
+    conn = get_connection()
+    conn.isolation_level = None  # Transaktion selbst steuern
+    target = None
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        rows = conn.execute(
+            "SELECT * FROM ausgaben WHERE date(datum) < ? ORDER BY datum, id",
+            (cutoff.isoformat(),)
+        ).fetchall()
+        if not rows:
+            conn.execute("ROLLBACK")
+            return {"cutoff": cutoff.isoformat(), "archived": 0, "file": None}
+
+        # Archiv vollständig schreiben, bevor gelöscht wird
+        os.makedirs(archive_dir, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        target = os.path.join(archive_dir, f"ausgaben-bis-{cutoff.isoformat()}-{stamp}.jsonl.gz")
+        with open(target, "wb") as raw:
+            with gzip.open(raw, "wt", encoding="utf-8") as f:
+                for row in rows:
+                    f.write(json.dumps(dict(row), ensure_ascii=False) + "\n")
+            raw.flush()
+            os.fsync(raw.fileno())
+
+        # Summen je Zyklus
+        totals: dict[tuple[date, date], list] = {}
+        for row in rows:
+            d = datetime.strptime(str(row["datum"])[:10], "%Y-%m-%d").date()
+            key = get_cycle_for_date(d, start_day, end_day)
+            entry = totals.setdefault(key, [0.0, 0])
+            entry[0] += float(row["betrag"])
+            entry[1] += 1
+
+        conn.executemany(
+            """
+            INSERT INTO zyklus_summen (zyklus_start, zyklus_ende, summe, anzahl)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(zyklus_start) DO UPDATE SET
+                summe = summe + excluded.summe,
+                anzahl = anzahl + excluded.anzahl,
+                archiviert_am = CURRENT_TIMESTAMP
+            """,
+            [(s.isoformat(), e.isoformat(), round(v[0], 2), v[1]) for (s, e), v in totals.items()]
+        )
+        # client_ids merken, damit ein später nachgereichter Offline-Sync sie nicht erneut anlegt
+        conn.executemany(
+            "INSERT OR IGNORE INTO archiv_client_ids (client_id) VALUES (?)",
+            [(row["client_id"],) for row in rows if row["client_id"]]
+        )
+        conn.executemany("DELETE FROM ausgaben WHERE id = ?", [(row["id"],) for row in rows])
+        conn.execute("COMMIT")
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        if target and os.path.exists(target):
+            os.remove(target)
+        raise
+    finally:
+        conn.close()
+
+    return {"cutoff": cutoff.isoformat(), "archived": len(rows), "file": target}
+
+# -----------------------------
+# CLI
+# -----------------------------
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=f"Wartung für {DB_PATH}")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_backup = sub.add_parser("backup", help="Online-Backup (blockiert die App nicht)")
+    p_backup.add_argument("--dest", default="backups", help="Zielordner (Standard: backups)")
+    p_backup.add_argument("--keep", type=int, default=7, help="Anzahl Backups behalten, 0 = alle (Standard: 7)")
+
+    p_opt = sub.add_parser("optimize", help="Incremental Vacuum + PRAGMA optimize")
+    p_opt.add_argument("--pages", type=int, default=0, help="max. freizugebende Seiten, 0 = alle (Standard: 0)")
+    p_opt.add_argument("--analyze", action="store_true", help="vollständiges ANALYZE erzwingen (sonst nur PRAGMA optimize)")
+
+    p_ret = sub.add_parser("retention", help="Alte Zyklen zusammenfassen und Rohdaten archivieren")
+    p_ret.add_argument("--keep-cycles", type=int, default=12, help="Zyklen mit Rohdaten behalten (Standard: 12)")
+    p_ret.add_argument("--archive-dir", default="archive", help="Ordner für Archivdateien (Standard: archive)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "backup":
+        target = backup(args.dest, args.keep)
+        print(f"Backup erstellt: {target}")
+    elif args.command == "optimize":
+        result = optimize(args.pages, args.analyze)
+        if result["converted"]:
+            print("auto_vacuum auf INCREMENTAL umgestellt (einmaliges VACUUM).")
+        print(f"Freigegebene Seiten: {result['freed_pages']}, verbleibend frei: {result['free_pages']}")
+    elif args.command == "retention":
+        result = retention(args.keep_cycles, args.archive_dir)
+        if result["archived"]:
+            print(f"{result['archived']} Ausgaben vor {result['cutoff']} archiviert: {result['file']}")
+            compact()  # ohne auto_vacuum-Umstellung, die bleibt `optimize` vorbehalten
+        else:
+            print(f"Keine Ausgaben vor {result['cutoff']}.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+/* Offline-Modus: Ausgaben lokal puffern und gesammelt an den Server senden */
+(function () {
+  const QUEUE_KEY = "budget-tool:pending-expenses";
+  const REJECTED_KEY = "budget-tool:rejected-expenses";
+  const script = document.currentScript;
+
+  // Service Worker registrieren (Cache für Assets + Dashboard)
+  if ("serviceWorker" in navigator && script && script.dataset.swUrl) {
+    navigator.serviceWorker.register(script.dataset.swUrl).catch(function () {});
+  }
+
+  function loadQueue() {
+    try {
+      return JSON.parse(localStorage.getItem(QUEUE_KEY)) || [];
+    } catch (e) {
+      return [];
+    }
+  }
+
+  function saveQueue(queue) {
+    localStorage.setItem(QUEUE_KEY, JSON.stringify(queue));
+  }
+
+  function newClientId() {
+    if (window.crypto && crypto.randomUUID) return crypto.randomUUID();
+    return Date.now().toString(36) + "-" + Math.random().toString(36).slice(2, 12);
+  }
+
+  // lokales Datum (YYYY-MM-DD) – offline erfasste Ausgaben behalten ihren Tag
+  function localDate() {
+    const d = new Date();
+    const pad = function (n) { return String(n).padStart(2, "0"); };
+    return d.getFullYear() + "-" + pad(d.getMonth() + 1) + "-" + pad(d.getDate());
+  }
+
+  function loadRejected() {
+    try {
+      return JSON.parse(localStorage.getItem(REJECTED_KEY)) || [];
+    } catch (e) {
+      return [];
+    }
+  }
+
+  // gleiche Regel wie der Server: Ziffern, optional mit Dezimalpunkt
+  const AMOUNT_RE = /^\d+(\.\d+)?$/;
+
+  // Wiederholung nach Fehlern: 5 s, verdoppelt bis max. 5 min
+  const RETRY_MIN_MS = 5000;
+  const RETRY_MAX_MS = 300000;
+
+  document.addEventListener("DOMContentLoaded", function () {
+    const form = document.querySelector("form.expense-form");
+    const status = document.getElementById("sync-status");
+    const rejectedBox = document.getElementById("sync-rejected");
+    const errorBox = document.getElementById("sync-error");
+    if (!form || !window.fetch || !window.localStorage) return;
+
+    const csrfInput = form.querySelector('input[name="csrf_token"]');
+    const batchSize = parseInt(form.dataset.syncMax, 10) || 100;
+    let syncing = false;
+    let acceptedAny = false;
+    let retryDelay = RETRY_MIN_MS;
+    let retryTimer = null;
+
+    function scheduleRetry() {
+      if (retryTimer) return;
+      retryTimer = setTimeout(function () {
+        retryTimer = null;
+        sync();
+      }, retryDelay);
+      retryDelay = Math.min(retryDelay * 2, RETRY_MAX_MS);
+    }
+
+    function renderStatus() {
+      if (status) {
+        const count = loadQueue().length;
+        status.hidden = count === 0;
+        status.textContent = (status.dataset.pendingText || "").replace("{n}", count);
+      }
+      if (rejectedBox) {
+        const rejected = loadRejected();
+        rejectedBox.hidden = rejected.length === 0;
+        rejectedBox.textContent = (rejectedBox.dataset.rejectedText || "").replace(
+          "{n}",
+          rejected.map(function (e) { return e.betrag + " (" + e.beschreibung + ")"; }).join(", ")
+        );
+      }
+    }
+
+    function sync() {
+      const queue = loadQueue();
+      if (syncing || queue.length === 0) {
+        renderStatus();
+        return;
+      }
+      if (!navigator.onLine) {
+        renderStatus();
+        scheduleRetry();
+        return;
+      }
+      if (retryTimer) {
+        clearTimeout(retryTimer);
+        retryTimer = null;
+      }
+      syncing = true;
+      let ok = false;
+      let csrfExpired = false;
+      const batch = queue.slice(0, batchSize);
+      fetch(form.dataset.syncUrl, {
+        method: "POST",
+        credentials: "same-origin",
+        headers: {
+          "Content-Type": "application/json",
+          "X-CSRF-Token": csrfInput ? csrfInput.value : "",
+        },
+        body: JSON.stringify({ expenses: batch }),
+      })
+        .then(function (res) {
+          // veraltetes CSRF-Token (z. B. Dashboard aus dem Cache) – nur ein Neuladen hilft
+          if (res.status === 403) csrfExpired = true;
+          if (!res.ok) throw new Error("sync failed: " + res.status);
+          return res.json();
+        })
+        .then(function (data) {
+          // angenommene (auch bereits bekannte) Einträge entfernen,
+          // abgelehnte für die Fehlermeldung aufheben
+          const accepted = new Set(data.accepted);
+          const rejected = new Set(data.rejected);
+          const current = loadQueue();
+          saveQueue(current.filter(function (e) {
+            return !accepted.has(e.client_id) && !rejected.has(e.client_id);
+          }));
+          const newlyRejected = current.filter(function (e) { return rejected.has(e.client_id); });
+          if (newlyRejected.length) {
+            localStorage.setItem(REJECTED_KEY, JSON.stringify(loadRejected().concat(newlyRejected)));
+          }
+          if (data.accepted.length) acceptedAny = true;
+          // ohne Fortschritt nicht endlos wiederholen
+          ok = data.accepted.length + data.rejected.length > 0;
+        })
+        .catch(function () { /* Pi nicht erreichbar, 5xx o. ä. – erneuter Versuch per Timer */ })
+        .finally(function () {
+          syncing = false;
+          if (errorBox) errorBox.hidden = !csrfExpired;
+          renderStatus();
+          if (csrfExpired) return;
+          if (!ok) {
+            if (loadQueue().length) scheduleRetry();
+            return;
+          }
+          retryDelay = RETRY_MIN_MS;
+          // Rest der Warteschlange (nächster Batch oder während des Syncs erfasst)
+          if (loadQueue().length) {
+            sync();
+          } else if (acceptedAny) {
+            window.location.reload();
+          }
+        });
+    }
+
+    if (rejectedBox) {
+      rejectedBox.addEventListener("click", function () {
+        localStorage.removeItem(REJECTED_KEY);
+        renderStatus();
+      });
+    }
+
+    form.addEventListener("submit", function (ev) {
+      const betrag = form.querySelector('input[name="betrag"]');
+      const beschreibung = form.querySelector('input[name="beschreibung"]');
+      const raw = (betrag.value || "").replace(",", ".").trim();
+      if (!AMOUNT_RE.test(raw)) return;  // Server zeigt Fehlermeldung
+
+      ev.preventDefault();
+      const queue = loadQueue();
+      queue.push({
+        client_id: newClientId(),
+        betrag: raw,
+        beschreibung: (beschreibung.value || "").trim(),
+        datum: localDate(),
+      });
+      saveQueue(queue);
+      form.reset();
+      sync();
+    });
+
+    window.addEventListener("online", sync);
+    sync();
+  });
+})();
@@ -0,0 +1,71 @@
+/* Service Worker: statische Dateien + letzter Dashboard-Stand offline verfügbar */
+const CACHE_NAME = "budget-tool-v1";
+const DASHBOARD_URL = "/";
+const STATIC_ASSETS = [
+  DASHBOARD_URL,
+  "/static/style.css",
+  "/static/offline.js",
+  "/static/manifest.webmanifest",
+];
+
+self.addEventListener("install", function (event) {
+  event.waitUntil(
+    caches.open(CACHE_NAME)
+      .then(function (cache) { return cache.addAll(STATIC_ASSETS); })
+      .then(function () { return self.skipWaiting(); })
+  );
+});
+
+self.addEventListener("activate", function (event) {
+  // alte Cache-Versionen aufräumen
+  event.waitUntil(
+    caches.keys()
+      .then(function (keys) {
+        return Promise.all(keys
+          .filter(function (key) { return key !== CACHE_NAME; })
+          .map(function (key) { return caches.delete(key); }));
+      })
+      .then(function () { return self.clients.claim(); })
+  );
+});
+
+self.addEventListener("fetch", function (event) {
+  const request = event.request;
+  if (request.method !== "GET") return;  // POSTs (Sync, Formulare) nie abfangen
+
+  const url = new URL(request.url);
+  if (url.origin !== self.location.origin) return;
+
+  // Statische Dateien: Cache zuerst, im Hintergrund aktualisieren
+  if (url.pathname.startsWith("/static/")) {
+    event.respondWith(
+      caches.open(CACHE_NAME).then(function (cache) {
+        return cache.match(request).then(function (cached) {
+          const network = fetch(request).then(function (response) {
+            if (response.ok) cache.put(request, response.clone());
+            return response;
+          }).catch(function () { return cached; });
+          return cached || network;
+        });
+      })
+    );
+    return;
+  }
+
+  // Dashboard: Netzwerk zuerst, offline letzter bekannter Stand
+  if (request.mode === "navigate" && url.pathname === DASHBOARD_URL) {
+    event.respondWith(
+      fetch(request)
+        .then(function (response) {
+          if (response.ok && !response.redirected) {
+            const copy = response.clone();
+            caches.open(CACHE_NAME).then(function (cache) { cache.put(DASHBOARD_URL, copy); });
+          }
+          return response;
+        })
+        .catch(function () {
+          return caches.match(DASHBOARD_URL);
+        })
+    );
+  }
+});
@@ -3,7 +3,9 @@ import sqlite3
 from datetime import datetime, timedelta, date
 from dateutil.relativedelta import relativedelta
 import calendar
+import math
 import os
+import re
 
 # -----------------------------
 # DB / Settings Basis
@@ -46,6 +48,33 @@ def ensure_settings():
     conn.commit()
     conn.close()
 
+def ensure_maintenance_schema():
+    """
+    Index für die Wochenabfragen (date(datum)), Summentabelle für archivierte Zyklen
+    und client_ids archivierter Ausgaben (Duplikatschutz beim Offline-Sync).
+    """
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute("CREATE INDEX IF NOT EXISTS idx_ausgaben_datum ON ausgaben (date(datum))")
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS zyklus_summen (
+            zyklus_start TEXT PRIMARY KEY,
+            zyklus_ende TEXT NOT NULL,
+            summe REAL NOT NULL DEFAULT 0,
+            anzahl INTEGER NOT NULL DEFAULT 0,
+            archiviert_am TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    c.execute("CREATE TABLE IF NOT EXISTS archiv_client_ids (client_id TEXT PRIMARY KEY)")
+    conn.commit()
+    conn.close()
+
+def reclaim_free_pages():
+    """Gibt freie Seiten nach großen DELETEs zurück (nur wirksam bei auto_vacuum=INCREMENTAL)."""
+    conn = get_connection()
+    conn.executescript("PRAGMA incremental_vacuum;")
+    conn.close()
+
 # -----------------------------
 # Währung / Currency
 # -----------------------------
@@ -314,6 +343,94 @@ def get_last_week_balance() -> float:
     conn.close()
     return round(wochenbudget - ausgaben, 2)
 
+# -----------------------------
+# Offline-Sync (Bulk-Import)
+# -----------------------------
+# max. Anzahl Ausgaben pro Sync-Request
+MAX_BULK_EXPENSES = 500
+
+# max. Länge der Beschreibung (länger wird abgeschnitten)
+MAX_DESCRIPTION_LENGTH = 200
+
+# Client-IDs: UUIDs o. ä., nur sichere Zeichen
+_CLIENT_ID_RE = re.compile(r"[A-Za-z0-9-]{1,64}")
+
+def ensure_sync_schema():
+    """
+    Ergänzt `ausgaben` um `client_id` (+ UNIQUE-Index), damit offline
+    erfasste Ausgaben beim erneuten Sync nicht doppelt gespeichert werden.
+    """
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute("PRAGMA table_info(ausgaben)")
+    columns = {row[1] for row in c.fetchall()}
+    if "client_id" not in columns:
+        c.execute("ALTER TABLE ausgaben ADD COLUMN client_id TEXT")
+    c.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_ausgaben_client_id ON ausgaben (client_id)")
+    conn.commit()
+    conn.close()
+
+def parse_bulk_expense(item) -> tuple[str, str, float, str] | None:
+    """Prüft einen Eintrag aus dem Sync-Payload -> (client_id, datum, betrag, beschreibung) oder None."""
+    if not isinstance(item, dict):
+        return None
+    client_id = item.get("client_id")
+    if not isinstance(client_id, str) or not _CLIENT_ID_RE.fullmatch(client_id):
+        return None
+
+    raw_amount = str(item.get("betrag", "") or "").replace(",", ".").strip()
+    try:
+        betrag = -abs(float(raw_amount))
+    except ValueError:
+        return None
+    if not math.isfinite(betrag):
+        return None
+
+    beschreibung = str(item.get("beschreibung", "") or "").strip()[:MAX_DESCRIPTION_LENGTH]
+
+    # Datum der Erfassung (offline evtl. ein anderer Tag als der Sync), Pflichtfeld
+    try:
+        erfasst = datetime.strptime(str(item.get("datum", "") or ""), "%Y-%m-%d").date()
+    except ValueError:
+        return None
+    # keine Zukunftsdaten; 1 Tag Toleranz für Zeitzonen-Unterschiede Client/Server
+    if erfasst > date.today() + timedelta(days=1):
+        return None
+
+    return client_id, erfasst.isoformat(), betrag, beschreibung
+
+def insert_expenses_bulk(items: list) -> tuple[list[str], list]:
+    """
+    Speichert alle gültigen Einträge in einer Transaktion.
+    Bereits bekannte (auch archivierte) client_ids werden ignoriert, aber als angenommen
+    gemeldet (idempotent).
+    Rückgabe: (angenommene client_ids, abgelehnte Einträge bzw. deren client_id)
+    """
+    accepted, rejected, rows = [], [], []
+    for item in items:
+        parsed = parse_bulk_expense(item)
+        if parsed is None:
+            rejected.append(item.get("client_id") if isinstance(item, dict) else None)
+            continue
+        rows.append(parsed)
+        accepted.append(parsed[0])
+
+    if rows:
+        conn = get_connection()
+        try:
+            with conn:
+                conn.executemany(
+                    """
+                    INSERT OR IGNORE INTO ausgaben (client_id, datum, betrag, beschreibung)
+                    SELECT ?, ?, ?, ?
+                    WHERE NOT EXISTS (SELECT 1 FROM archiv_client_ids WHERE client_id = ?)
+                    """,
+                    [row + (row[0],) for row in rows]
+                )
+        finally:
+            conn.close()
+    return accepted, rejected
+
 # -----------------------------
 # Mehrsprachigkeit / i18n
 # -----------------------------